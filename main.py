@@ -1,3 +1,7 @@
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
 import uvicorn
 
 from src.application.api import API
@@ -6,9 +10,30 @@ from src.services.sqlite_conn import SQliteConn
 from src.services.temporal_cache import TemporalCache
 
 if __name__ == "__main__":
+    # Los handlers de la app solo encolan registros; la escritura a stderr
+    # ocurre en el hilo del QueueListener, fuera del event loop.
+    log_queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+    log_listener: QueueListener = QueueListener(log_queue, logging.StreamHandler())
+    logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+    log_listener.start()
+
     pruner: LogPruner = LogPruner(window_minutes=5)
     cache: TemporalCache = TemporalCache(pruner=pruner)
     sqlite: SQliteConn = SQliteConn(db_path=r"data/logs.db")
     api: API = API(cache=cache, db_service=sqlite)
 
-    uvicorn.run(api.app)
+    try:
+        # loop/http "auto" eligen uvloop y httptools cuando están instalados
+        # (uvloop no existe en Windows); el access log se desactiva porque
+        # escribe una línea por petición.
+        uvicorn.run(
+            api.app,
+            host="127.0.0.1",
+            port=8000,
+            loop="auto",
+            http="auto",
+            log_level="warning",
+            access_log=False,
+        )
+    finally:
+        log_listener.stop()
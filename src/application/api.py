@@ -1,15 +1,25 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import partial
+from heapq import merge
+from operator import attrgetter
 from typing import ClassVar
 
 from fastapi import BackgroundTasks, FastAPI, Query
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
 
 from src.model.log_entry import LogEntry
 from src.model.log_list import LogList
+from src.services.batch_writer import BatchWriter
 from src.services.sqlite_conn import SQliteConn
 from src.services.temporal_cache import TemporalCache
 
+logger: logging.Logger = logging.getLogger(__name__)
+
 
 class API:
     """API FastAPI para gestión de logs con cache temporal y almacenamiento persistente.
@@ -18,44 +28,74 @@ class API:
     1. Maneja la recepción y almacenamiento de logs
     2. Proporciona endpoints para consultar logs por rango temporal
     3. Gestiona la limpieza automática del cache
-    4. Persiste logs antiguos en base de datos
+    4. Persiste logs antiguos en base de datos en lotes
 
     Attributes:
         __app (FastAPI): Instancia de FastAPI que maneja los endpoints
         __cache (TemporalCache): Cache temporal para almacenar logs recientes
         __db_service (SQliteConn): Servicio de base de datos para persistencia
+        __writer (BatchWriter): Agrupa los logs eliminados del cache en escrituras por lotes
     """
 
     START_TIME_QUERY: ClassVar[datetime] = Query(..., description="Start time in ISO format")
     END_TIME_QUERY: ClassVar[datetime] = Query(..., description="End time in ISO format")
+    TAG_QUERY: ClassVar[str | None] = Query(None, description="Only return logs with this tag")
     PRUNING_ERROR_MSG: ClassVar[str] = "Error during pruning: {}"
+    LOGS_ADAPTER: ClassVar[TypeAdapter[list[LogEntry]]] = TypeAdapter(list[LogEntry])
+    LOGS_RESPONSE_PREFIX: ClassVar[bytes] = b'{"logs":'
+    LOGS_RESPONSE_SUFFIX: ClassVar[bytes] = b"}"
 
     def __init__(self, cache: TemporalCache, db_service: SQliteConn):
+        self.__cache: TemporalCache = cache
+        self.__db_service: SQliteConn = db_service
+        self.__writer: BatchWriter = BatchWriter(db_service=db_service)
         self.__app = FastAPI(
             title="Log API",
             description="API for managing logs",
             version="1.0.0",
+            lifespan=self.__lifespan,
         )
-        self.__cache: TemporalCache = cache
-        self.__db_service: SQliteConn = db_service
         self.__set_up_routes()
 
     @property
     def app(self) -> FastAPI:
         return self.__app
 
+    @asynccontextmanager
+    async def __lifespan(self, app: FastAPI) -> AsyncIterator[None]:
+        """Ciclo de vida de la app.
+
+        Antes de aceptar tráfico precalienta la base de datos e inicia el BatchWriter;
+        al apagar, vacía el BatchWriter y cierra la conexión a la base de datos.
+
+        Args:
+            app (FastAPI): Aplicación gestionada por este lifespan
+
+        Yields:
+            None: Control a la app mientras atiende peticiones
+        """
+        await asyncio.to_thread(self.__db_service.warm_up)
+        await self.__writer.start()
+        try:
+            yield
+        finally:
+            await self.__writer.stop()
+            self.__db_service.close()
+
     def __set_up_routes(self) -> "API":
         """Configura las rutas de la API.
 
         Establece los endpoints disponibles:
-        - POST /logs: Añadir nuevos logs
+        - POST /logs: Añadir un log individual
+        - POST /logs/batch: Añadir una lista de logs
         - GET /logs: Obtener logs por rango temporal
         - GET /logs/all: Obtener todos los logs en cache
 
         Returns:
             API: Self para permitir encadenamiento
         """
-        self.__app.post("/logs")(self.add_logs)
+        self.__app.post("/logs")(self.add_log)
+        self.__app.post("/logs/batch")(self.add_logs)
         self.__app.get("/logs")(self.get_logs)
         self.__app.get("/logs/all")(self.get_all_logs)
         return self
@@ -74,11 +114,14 @@ class API:
         except Exception as e:
             raise ValueError(self.PRUNING_ERROR_MSG.format(e)) from e
         else:
-            print(f"Pruned logs: {pruned_logs}")
+            logger.debug("Pruned %d logs", len(pruned_logs))
             return pruned_logs
 
     def __save_pruned_logs(self, pruned_logs: list[LogEntry]) -> "API":
-        """Persiste los logs eliminados en la base de datos.
+        """Encola los logs eliminados para persistirlos en la base de datos.
+
+        Los logs se entregan al BatchWriter, que los agrupa con los de otras
+        peticiones y los guarda en una única transacción.
 
         Args:
             pruned_logs (list[LogEntry]): Logs a persistir
@@ -89,21 +132,68 @@ class API:
         if not pruned_logs:
             return self
 
-        self.__db_service.save_logs(pruned_logs)
+        self.__writer.submit(pruned_logs)
         return self
 
-    async def add_logs(
-        self, logs: LogEntry | LogList, background_task: BackgroundTasks
-    ) -> JSONResponse:
-        """Añade uno o varios logs al sistema.
+    async def __prune_and_save(self) -> "API":
+        """Limpia el cache y encola los logs eliminados; se ejecuta como tarea en background.
+
+        Es una corrutina para que Starlette la ejecute en el event loop después de
+        enviar la respuesta, y no en el threadpool: así el cache solo se modifica
+        desde el hilo del event loop.
+
+        Returns:
+            API: Self para permitir encadenamiento
+        """
+        return self.__save_pruned_logs(self.__prune_logs())
+
+    def __logs_response(self, logs: list[LogEntry]) -> Response:
+        """Construye la respuesta {"logs": [...]} serializando los logs directamente a bytes.
+
+        TypeAdapter.dump_json serializa la lista en una sola pasada en pydantic-core,
+        sin construir diccionarios intermedios ni volver a codificarlos con json.
+
+        Args:
+            logs (list[LogEntry]): Logs a incluir en la respuesta
+
+        Returns:
+            Response: Respuesta HTTP 200 con media_type "application/json"
+        """
+        content: bytes = (
+            self.LOGS_RESPONSE_PREFIX
+            + self.LOGS_ADAPTER.dump_json(logs)
+            + self.LOGS_RESPONSE_SUFFIX
+        )
+        return Response(content=content, media_type="application/json", status_code=200)
+
+    def __accept_logs(self, count: int, background_task: BackgroundTasks) -> JSONResponse:
+        """Programa la limpieza del cache, si hay logs vencidos, y construye la respuesta.
+
+        Args:
+            count (int): Cantidad de logs añadidos al cache
+            background_task (BackgroundTasks): Manejador de tareas en background
+
+        Returns:
+            JSONResponse: Confirmación con cantidad de logs procesados
+        """
+        logger.debug("Added %d logs to cache", count)
+        if self.__cache.prune_due():
+            background_task.add_task(self.__prune_and_save)
+        return JSONResponse(
+            content={"message": f"Successfully added {count} logs", "count": count},
+            status_code=201,
+        )
 
-        Procesa la entrada (log individual o lista) y:
-        1. Almacena los logs en el cache temporal
+    async def add_log(self, log: LogEntry, background_task: BackgroundTasks) -> JSONResponse:
+        """Añade un log individual al sistema.
+
+        Procesa la entrada y:
+        1. Almacena el log en el cache temporal
         2. Ejecuta limpieza (pruning) en background
-        3. Persiste logs eliminados en base de datos
+        3. Encola los logs eliminados para persistirlos por lotes
 
         Args:
-            log_list (LogEntry | LogList): Log individual o lista de logs
+            log (LogEntry): Log a añadir
             background_task (BackgroundTasks): Manejador de tareas en background
 
         Returns:
@@ -111,6 +201,30 @@ class API:
 
         Example:
             POST /logs
+            {
+                "timestamp": "2023-04-23T10:00:00",
+                "tag": "INFO",
+                "message": "Test log"
+            }
+        """
+        self.__cache.add_log(log)
+        return self.__accept_logs(1, background_task)
+
+    async def add_logs(self, logs: LogList, background_task: BackgroundTasks) -> JSONResponse:
+        """Añade una lista de logs al sistema.
+
+        Igual que add_log, pero para un lote de logs recibido en una sola petición;
+        el lote se inserta en el cache con una sola llamada a bulk_add_logs.
+
+        Args:
+            logs (LogList): Lista de logs a añadir
+            background_task (BackgroundTasks): Manejador de tareas en background
+
+        Returns:
+            JSONResponse: Confirmación con cantidad de logs procesados
+
+        Example:
+            POST /logs/batch
             {
                 "logs": [
                     {
@@ -121,44 +235,42 @@ class API:
                 ]
             }
         """
-        assert isinstance(logs, LogEntry | LogList), "Invalid input type"
-
-        log_list: list[LogEntry] = [logs] if isinstance(logs, LogEntry) else logs.logs
-
-        for log_entry in log_list:
-            print(log_entry)
-            self.__cache.add_log(log_entry)
-
-        background_task.add_task(self.__save_pruned_logs, self.__prune_logs())
-        return JSONResponse(
-            content={"message": f"Successfully added {len(log_list)} logs", "count": len(log_list)},
-            status_code=201,
-        )
+        self.__cache.bulk_add_logs(logs.logs)
+        return self.__accept_logs(len(logs.logs), background_task)
 
     async def get_logs(
         self,
         start_time: datetime = START_TIME_QUERY,
         end_time: datetime = END_TIME_QUERY,
-    ) -> JSONResponse:
+        tag: str | None = TAG_QUERY,
+    ) -> Response:
         """Obtiene logs dentro de un rango temporal específico.
 
         Este método:
-        1. Busca primero en el cache temporal
-        2. Si no encuentra logs en cache, busca en la base de datos
-        3. Convierte los logs encontrados a formato JSON
+        1. Envía la consulta a la base de datos al executor por defecto del event loop,
+           donde empieza a ejecutarse de inmediato en otro hilo
+        2. Mientras tanto, busca en el cache temporal desde el event loop
+        3. Combina ambos resultados en orden temporal, de modo que un rango que
+           abarca logs recientes y antiguos devuelve ambos
+        4. Serializa los logs encontrados directamente a JSON
+
+        Los logs del cache y de la base de datos son disjuntos: un log solo pasa a
+        la base de datos después de ser eliminado del cache.
 
         Args:
             start_time (datetime): Inicio del rango temporal en formato ISO (YYYY-MM-DDTHH:MM:SS)
             end_time (datetime): Fin del rango temporal en formato ISO (YYYY-MM-DDTHH:MM:SS)
+            tag (str | None): Si se indica, solo se retornan los logs con ese tag
 
         Returns:
-            JSONResponse: Respuesta HTTP con:
+            Response: Respuesta HTTP con:
                 - content: {"logs": [lista de logs encontrados]}
                 - media_type: "application/json"
                 - status_code: 200
 
         Example:
             GET /logs?start_time=2023-04-23T10:00:00&end_time=2023-04-23T10:05:00
+            GET /logs?start_time=2023-04-23T10:00:00&end_time=2023-04-23T10:05:00&tag=ERROR
 
             Response:
             {
@@ -171,26 +283,26 @@ class API:
                 ]
             }
         """
-        cache_logs: list[LogEntry] = self.__cache.get_logs(start_time, end_time)
-        overall_logs: list[LogEntry] = (
-            cache_logs if cache_logs else self.__db_service.get_logs(start_time, end_time)
-        )  # buscamos en la base de datos si no estan en el cache
-        jsonable_logs: list[dict] = [jsonable_encoder(log.model_dump()) for log in overall_logs]
+        db_future: asyncio.Future[list[LogEntry]] = asyncio.get_running_loop().run_in_executor(
+            None, partial(self.__db_service.get_logs, start_time, end_time, tag)
+        )
+        cache_logs: list[LogEntry] = self.__cache.get_logs(start_time, end_time, tag)
+        db_logs: list[LogEntry] = await db_future
 
-        return JSONResponse(
-            content={"logs": jsonable_logs}, media_type="application/json", status_code=200
+        overall_logs: list[LogEntry] = (
+            list(merge(db_logs, cache_logs, key=attrgetter("epoch_micros")))
+            if db_logs and cache_logs
+            else db_logs or cache_logs
         )
+        return self.__logs_response(overall_logs)
 
-    async def get_all_logs(self) -> JSONResponse:
+    async def get_all_logs(self) -> Response:
         """Obtiene todos los logs almacenados en el cache temporal.
 
         Returns:
-            JSONResponse: Lista completa de logs en cache
+            Response: Lista completa de logs en cache
 
         Example:
             GET /logs/all
         """
-        logs: list[LogEntry] = [
-            jsonable_encoder(log.model_dump()) for log in self.__cache.get_all_logs()
-        ]
-        return JSONResponse(content={"logs": logs}, media_type="application/json", status_code=200)
+        return self.__logs_response(self.__cache.get_all_logs())
@@ -1,14 +1,67 @@
-from datetime import datetime
+import sys
+from datetime import UTC, datetime, timedelta, timezone
+from typing import Any, ClassVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, PrivateAttr, field_validator
 
 
-# @dataclass
 class LogEntry(BaseModel):
+    """Log recibido por la API.
+
+    Es un modelo de Pydantic (y no un dataclass) porque FastAPI lo usa para validar
+    y documentar los bodies de entrada. Es inmutable (frozen), lo que además lo hace
+    hashable; Pydantic ya declara __slots__ para su estado interno.
+
+    Al construirse precalcula epoch_micros, el timestamp como entero, que es la
+    clave por la que se ordenan y comparan los logs en el cache y en la base de datos.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
     timestamp: datetime
     tag: str  # e.g., "INFO", "ERROR", "DEBUG"
     message: str
 
+    EPOCH: ClassVar[datetime] = datetime(1970, 1, 1)
+    MICROSECOND: ClassVar[timedelta] = timedelta(microseconds=1)
+
+    _epoch_micros: int = PrivateAttr()
+
+    def model_post_init(self, context: Any) -> None:
+        """Precalcula epoch_micros una sola vez, tras validar o construir el modelo.
+
+        Args:
+            context (Any): Contexto de validación de Pydantic (no se usa)
+        """
+        self._epoch_micros = LogEntry.to_epoch_micros(self.timestamp)
+
+    @property
+    def epoch_micros(self) -> int:
+        """Timestamp del log en microsegundos desde el epoch Unix (UTC).
+
+        Returns:
+            int: Resultado de to_epoch_micros(timestamp), calculado al construir el log
+        """
+        return self._epoch_micros
+
+    @field_validator("tag")
+    @classmethod
+    def intern_tag(cls, tag: str) -> str:
+        """Interna el tag para que todos los logs con el mismo tag compartan un único str.
+
+        Los tags tienen muy baja cardinalidad ("INFO", "ERROR", ...), pero cada body
+        JSON parseado crea un str nuevo por log. Internarlos funciona como una
+        codificación por diccionario: el cache guarda una referencia por log en lugar
+        de una copia del texto.
+
+        Args:
+            tag (str): Tag recibido
+
+        Returns:
+            str: Instancia internada del tag
+        """
+        return sys.intern(tag)
+
     def __lt__(self, other: "LogEntry") -> bool:
         """Compara dos objetos LogEntry basándose en sus timestamps.
 
@@ -37,7 +90,80 @@ class LogEntry(BaseModel):
             y el proceso de limpieza (pruning) de logs antiguos.
         """
         assert isinstance(other, LogEntry), NotImplemented
-        return self.timestamp < other.timestamp
+        return self.epoch_micros < other.epoch_micros
+
+    @staticmethod
+    def to_epoch_micros(timestamp: datetime) -> int:
+        """Convierte un timestamp a microsegundos desde el epoch Unix.
+
+        Los timestamps naive se interpretan como UTC; los que tienen zona horaria
+        se normalizan a UTC antes de convertirse. Es la representación usada para
+        persistir los logs en la base de datos.
+
+        Args:
+            timestamp (datetime): Timestamp a convertir
+
+        Returns:
+            int: Microsegundos transcurridos desde 1970-01-01T00:00:00 UTC
+
+        Example:
+            LogEntry.to_epoch_micros(datetime(1970, 1, 1, 0, 0, 1))  # 1_000_000
+        """
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(UTC).replace(tzinfo=None)
+        return (timestamp - LogEntry.EPOCH) // LogEntry.MICROSECOND
+
+    @staticmethod
+    def to_utc_offset_micros(timestamp: datetime) -> int | None:
+        """Obtiene el desfase UTC de un timestamp en microsegundos.
+
+        Se persiste junto a epoch micros para que un log con zona horaria conserve
+        su desfase original al leerse de la base de datos.
+
+        Args:
+            timestamp (datetime): Timestamp del que obtener el desfase
+
+        Returns:
+            int | None: Desfase respecto a UTC en microsegundos, o None si es naive
+
+        Example:
+            LogEntry.to_utc_offset_micros(datetime(2023, 1, 1, tzinfo=UTC))  # 0
+        """
+        offset: timedelta | None = timestamp.utcoffset()
+        return None if offset is None else offset // LogEntry.MICROSECOND
+
+    @staticmethod
+    def from_epoch_micros(micros: int, utc_offset: int | None = None) -> datetime:
+        """Convierte microsegundos desde el epoch Unix a un timestamp.
+
+        Args:
+            micros (int): Microsegundos transcurridos desde 1970-01-01T00:00:00 UTC
+            utc_offset (int | None): Desfase UTC original en microsegundos, o None si el
+                timestamp era naive
+
+        Returns:
+            datetime: Timestamp naive en UTC si utc_offset es None; si no, el mismo
+                instante expresado con su desfase original
+        """
+        timestamp: datetime = LogEntry.EPOCH + timedelta(microseconds=micros)
+        if utc_offset is None:
+            return timestamp
+        return timestamp.replace(tzinfo=UTC).astimezone(
+            timezone(timedelta(microseconds=utc_offset))
+        )
+
+    def to_db_row(self) -> tuple[int, str, str, int | None]:
+        """Convierte el log en una fila para la base de datos (inversa de from_db_row).
+
+        Returns:
+            tuple[int, str, str, int | None]: (epoch micros, tag, mensaje, desfase UTC)
+        """
+        return (
+            self.epoch_micros,
+            self.tag,
+            self.message,
+            LogEntry.to_utc_offset_micros(self.timestamp),
+        )
 
     @staticmethod
     def from_db_row(row: tuple) -> "LogEntry":
@@ -45,9 +171,10 @@ class LogEntry(BaseModel):
 
         Este método estático convierte una fila de la base de datos en un objeto LogEntry,
         esperando los campos en el siguiente orden:
-        - row[0]: timestamp en formato ISO (YYYY-MM-DDTHH:MM:SS)
+        - row[0]: timestamp en microsegundos desde el epoch Unix (INTEGER)
         - row[1]: tag del log (e.g., "INFO", "ERROR")
         - row[2]: mensaje del log
+        - row[3]: desfase UTC en microsegundos, o NULL si el timestamp era naive
 
         Args:
             row (tuple): Tupla con los datos del log desde la base de datos
@@ -56,14 +183,15 @@ class LogEntry(BaseModel):
             LogEntry: Nueva instancia de LogEntry con los datos de la fila
 
         Example:
-            db_row = ("2023-04-23T10:00:00", "INFO", "Test message")
+            db_row = (1682244000000000, "INFO", "Test message", None)
             log = LogEntry.from_db_row(db_row)
 
         Note:
-            El timestamp debe estar en formato ISO para poder ser parseado correctamente
-            por datetime.fromisoformat()
+            El timestamp se reconstruye con from_epoch_micros: naive en UTC, o con su
+            desfase original si el log se recibió con zona horaria.
+            Se usa model_construct para omitir la validación de Pydantic: las filas
+            provienen de nuestro propio esquema y ya fueron validadas al ingresar.
         """
-        return LogEntry(timestamp=datetime.fromisoformat(row[0]), tag=row[1], message=row[2])
-
-    class Config:
-        frozen = True
+        return LogEntry.model_construct(
+            timestamp=LogEntry.from_epoch_micros(row[0], row[3]), tag=row[1], message=row[2]
+        )
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from typing import ClassVar
+
+from src.model.log_entry import LogEntry
+from src.services.sqlite_conn import SQliteConn
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """Agrupa las escrituras a base de datos en lotes servidos por una única tarea.
+
+    En lugar de ejecutar una transacción por petición, los logs recibidos se encolan
+    y una tarea de larga duración los acumula y los persiste en una sola transacción
+    cuando se alcanza max_batch_size o cuando vence flush_interval_ms desde el primer
+    log pendiente. Si un flush falla, el lote se conserva y se reintenta en el
+    siguiente intervalo; mientras tanto, superar max_batch_size no dispara nuevos
+    intentos, para no repetir un flush fallido (y su salto a otro hilo) por cada
+    submit mientras la base de datos no responde.
+
+    Attributes:
+        __db_service (SQliteConn): Servicio de base de datos donde se persisten los lotes
+        __max_batch_size (int): Cantidad de logs pendientes que fuerza un flush
+        __flush_interval (float): Tiempo máximo (segundos) que un log espera en el buffer
+    """
+
+    FLUSH_ERROR_MSG: ClassVar[str] = "Error flushing %d logs to database"
+
+    def __init__(
+        self, db_service: SQliteConn, max_batch_size: int = 1000, flush_interval_ms: int = 100
+    ):
+        self.__db_service: SQliteConn = db_service
+        self.__max_batch_size: int = max_batch_size
+        self.__flush_interval: float = flush_interval_ms / 1000
+        self.__queue: asyncio.Queue[list[LogEntry] | None] | None = None
+        self.__task: asyncio.Task[None] | None = None
+
+    async def start(self) -> "BatchWriter":
+        """Crea la cola y lanza la tarea consumidora en el event loop actual.
+
+        Returns:
+            BatchWriter: Self para permitir encadenamiento
+        """
+        self.__ensure_started()
+        return self
+
+    async def stop(self) -> None:
+        """Detiene la tarea consumidora tras persistir todos los logs pendientes."""
+        if self.__queue is None or self.__task is None:
+            return
+
+        self.__queue.put_nowait(None)
+        await self.__task
+        self.__queue, self.__task = None, None
+
+    def submit(self, logs: list[LogEntry]) -> "BatchWriter":
+        """Encola logs para ser persistidos en el siguiente lote.
+
+        Debe llamarse desde un event loop. Si el writer no fue iniciado con start()
+        (por ejemplo, si la app corre sin eventos de lifespan), se inicia aquí.
+
+        Args:
+            logs (list[LogEntry]): Logs a persistir
+
+        Returns:
+            BatchWriter: Self para permitir encadenamiento
+        """
+        if logs:
+            self.__ensure_started().put_nowait(logs)
+        return self
+
+    def __ensure_started(self) -> "asyncio.Queue[list[LogEntry] | None]":
+        """Crea la cola y la tarea consumidora si aún no existen.
+
+        Returns:
+            asyncio.Queue: Cola de la que consume la tarea
+        """
+        if self.__queue is None:
+            self.__queue = asyncio.Queue()
+            self.__task = asyncio.create_task(self.__writer_loop(self.__queue))
+        return self.__queue
+
+    async def __writer_loop(self, queue: "asyncio.Queue[list[LogEntry] | None]") -> None:
+        """Consume la cola acumulando logs hasta que se cumpla una condición de flush.
+
+        Un valor None en la cola indica el cierre: se persiste lo pendiente y termina.
+        Si la tarea es cancelada, también intenta persistir lo pendiente antes de salir.
+
+        Args:
+            queue (asyncio.Queue): Cola de lotes a consumir
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        pending: list[LogEntry] = list()
+        deadline: float = 0.0
+        backing_off: bool = False
+
+        try:
+            while True:
+                try:
+                    async with asyncio.timeout_at(deadline if pending else None):
+                        logs: list[LogEntry] | None = await queue.get()
+                except TimeoutError:
+                    pending = await self.__flush(pending)
+                    backing_off = bool(pending)
+                    deadline = loop.time() + self.__flush_interval
+                    continue
+
+                if logs is None:
+                    await self.__flush(pending)
+                    return
+
+                if not pending:
+                    deadline = loop.time() + self.__flush_interval
+                pending.extend(logs)
+                if not backing_off and len(pending) >= self.__max_batch_size:
+                    pending = await self.__flush(pending)
+                    backing_off = bool(pending)
+                    deadline = loop.time() + self.__flush_interval
+        except asyncio.CancelledError:
+            await self.__flush(pending)
+            raise
+
+    async def __flush(self, batch: list[LogEntry]) -> list[LogEntry]:
+        """Persiste un lote fuera del event loop.
+
+        Args:
+            batch (list[LogEntry]): Logs acumulados a persistir
+
+        Returns:
+            list[LogEntry]: Buffer vacío si el lote se guardó, o el mismo lote si
+                falló, para seguir acumulando sobre él y reintentarlo más tarde
+        """
+        if not batch:
+            return batch
+
+        try:
+            await asyncio.to_thread(self.__db_service.save_logs, batch)
+        except Exception:
+            logger.exception(self.FLUSH_ERROR_MSG, len(batch))
+            return batch
+        return list()
@@ -1,55 +1,47 @@
-from collections import deque
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-from sortedcontainers import SortedDict
+from sortedcontainers import SortedKeyList
 
 from src.model.log_entry import LogEntry
 
 
 class LogPruner:
     def __init__(self, window_minutes: int):
-        self.__window_minutes: int = window_minutes
-        self.__timestamps: deque[datetime] = deque()
+        self.__window: timedelta = timedelta(minutes=window_minutes)
+        self.__window_micros: int = self.__window // LogEntry.MICROSECOND
 
-    def register_timestamp(self, timestamp: datetime) -> "LogPruner":
-        """Registra un nuevo timestamp para el seguimiento temporal de logs.
+    def is_due(self, logs_cache: SortedKeyList) -> bool:
+        """Indica si hay logs fuera de la ventana temporal, sin modificar el cache.
 
-        Este método mantiene un registro ordenado de timestamps que se utilizan
-        para determinar qué logs deben ser eliminados del cache (pruning).
-        Los timestamps se almacenan en una cola doblemente terminada (deque)
-        para facilitar operaciones eficientes tanto al inicio como al final.
+        Compara en O(1) el log más antiguo con el umbral derivado del más reciente.
 
         Args:
-            timestamp (datetime): Marca temporal del log a registrar
+            logs_cache (SortedKeyList): Logs del cache ordenados por epoch_micros
 
         Returns:
-            LogPruner: Retorna self para permitir encadenamiento de métodos
-
-        Example:
-            pruner = LogPruner(window_minutes=5)
-            pruner.register_timestamp(datetime.now())
+            bool: True si prune eliminaría al menos un log
         """
-        self.__timestamps.append(timestamp)
-        return self
+        return bool(logs_cache) and (
+            logs_cache[0].epoch_micros <= logs_cache[-1].epoch_micros - self.__window_micros
+        )
 
-    def prune(self, logs_cache: SortedDict) -> list[LogEntry]:
+    def prune(self, logs_cache: SortedKeyList) -> list[LogEntry]:
         """Elimina logs antiguos basándose en una ventana temporal deslizante.
 
         Este método implementa la lógica de limpieza del cache temporal:
-        1. Encuentra el timestamp más reciente
+        1. Toma el timestamp más reciente (el último log del cache ordenado)
         2. Calcula un umbral restando window_minutes al más reciente
-        3. Elimina todos los logs anteriores al umbral
+        3. Localiza por búsqueda binaria el último log anterior o igual al umbral
+        4. Elimina en bloque ese prefijo del cache
 
         Args:
-            logs_cache (SortedDict): Diccionario ordenado que contiene los logs,
-                                    donde las claves son timestamps y los valores
-                                    son listas de LogEntry
+            logs_cache (SortedKeyList): Logs del cache ordenados por epoch_micros
 
         Returns:
             list[LogEntry]: Lista de logs que fueron eliminados del cache
 
         Example:
-            cache = SortedDict()
+            cache = SortedKeyList(key=attrgetter("epoch_micros"))
             pruner = LogPruner(window_minutes=5)
             logs_eliminados = pruner.prune(cache)  # Elimina logs > 5 min
 
@@ -57,16 +49,11 @@ class LogPruner:
             La ventana temporal se configura en el constructor de LogPruner
             mediante el parámetro window_minutes.
         """
-        if not self.__timestamps:
+        if not logs_cache:
             return list()
 
-        most_recent: datetime = max(self.__timestamps)
-        threshold = most_recent - timedelta(minutes=self.__window_minutes)
-        pruned_logs = list()
-
-        while self.__timestamps and self.__timestamps[0] <= threshold:
-            timestamp: datetime = self.__timestamps.popleft()
-            if timestamp in logs_cache:
-                pruned_logs.extend(logs_cache.pop(timestamp))
-
+        threshold: int = logs_cache[-1].epoch_micros - self.__window_micros
+        cut: int = logs_cache.bisect_key_right(threshold)
+        pruned_logs: list[LogEntry] = logs_cache[:cut]
+        del logs_cache[:cut]
         return pruned_logs
@@ -1,34 +1,71 @@
+import logging
 from datetime import datetime
 from os.path import abspath, exists
-from sqlite3 import Cursor, connect
+from sqlite3 import Connection, connect
+from threading import Lock
 from typing import ClassVar
 
 from src.model.log_entry import LogEntry
 
+logger: logging.Logger = logging.getLogger(__name__)
+
 
 class SQliteConn:
     NON_EXISTENT_PATH: ClassVar[str] = "The path to the database does not exist."
     DB_SAVE_ERROR_MSG: ClassVar[str] = "Error saving logs to database: {}"
     DB_RETRIEVE_ERROR_MSG: ClassVar[str] = "Error retrieving logs from database: {}"
+    DB_SCHEMA_ERROR_MSG: ClassVar[str] = "Unsupported schema for table {}: {}"
+    DB_MIGRATION_ERROR_MSG: ClassVar[str] = "Error migrating table {} to the current schema: {}"
 
+    PRAGMAS: ClassVar[tuple[str, ...]] = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA cache_size=-65536",
+    )
     CREATE_TABLE_QUERY: ClassVar[str] = """
     CREATE TABLE IF NOT EXISTS {} (
-        timestamp TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
         tag TEXT NOT NULL,
-        message TEXT NOT NULL
+        message TEXT NOT NULL,
+        utc_offset INTEGER
     )
     """
+    TABLE_INFO_QUERY: ClassVar[str] = "PRAGMA table_info({})"
+    ADD_UTC_OFFSET_QUERY: ClassVar[str] = "ALTER TABLE {} ADD COLUMN utc_offset INTEGER"
+    SELECT_LEGACY_LOGS_QUERY: ClassVar[str] = "SELECT timestamp, tag, message FROM {}"
+    DROP_TABLE_QUERY: ClassVar[str] = "DROP TABLE {}"
+    RENAME_TABLE_QUERY: ClassVar[str] = "ALTER TABLE {} RENAME TO {}"
+    CREATE_INDEX_QUERY: ClassVar[str] = """
+    CREATE INDEX IF NOT EXISTS idx_{0}_timestamp ON {0} (timestamp)
+    """
+    CREATE_TAG_INDEX_QUERY: ClassVar[str] = """
+    CREATE INDEX IF NOT EXISTS idx_{0}_tag_timestamp ON {0} (tag, timestamp)
+    """
     GET_LOGS_QUERY: ClassVar[str] = """
     SELECT
-        timestamp, tag, message
+        timestamp, tag, message, utc_offset
     FROM
         {}
     WHERE
-        timestamp BETWEEN ? AND ?;
+        timestamp BETWEEN ? AND ?
+    ORDER BY
+        timestamp;
+    """
+    GET_LOGS_BY_TAG_QUERY: ClassVar[str] = """
+    SELECT
+        timestamp, tag, message, utc_offset
+    FROM
+        {}
+    WHERE
+        tag = ? AND timestamp BETWEEN ? AND ?
+    ORDER BY
+        timestamp;
     """
     INSERT_LOG_QUERY: ClassVar[str] = """
-    INSERT INTO {} (timestamp, tag, message)
-    VALUES (?, ?, ?)
+    INSERT INTO {} (timestamp, tag, message, utc_offset)
+    VALUES (?, ?, ?, ?)
     """
 
     def __init__(self, db_path: str, logs_table: str = "logs"):
@@ -36,25 +73,146 @@ class SQliteConn:
         assert exists(self.__db_path), self.NON_EXISTENT_PATH
 
         self.__logs_table: str = logs_table
-        self.__init_db_connection()
+        self.__insert_query: str = self.INSERT_LOG_QUERY.format(logs_table)
+        self.__get_logs_query: str = self.GET_LOGS_QUERY.format(logs_table)
+        self.__get_logs_by_tag_query: str = self.GET_LOGS_BY_TAG_QUERY.format(logs_table)
+        self.__lock: Lock = Lock()
+        self.__conn: Connection = self.__init_db_connection()
 
-    def __init_db_connection(self) -> None:
-        """Inicializa la conexión a la base de datos SQLite y crea la tabla si no existe.
+    def __init_db_connection(self) -> Connection:
+        """Abre la conexión persistente a SQLite y crea la tabla si no existe.
 
         Este método es llamado durante la inicialización del SQliteConn y se encarga de:
-        1. Establecer la conexión inicial con la base de datos
-        2. Crear la tabla de logs si no existe
-        3. Asegurar que la base de datos está lista para almacenar logs
+        1. Abrir una única conexión que se reutiliza durante toda la vida del servicio
+        2. Configurar la base de datos mediante los PRAGMAS (WAL, synchronous=NORMAL, ...)
+        3. Crear la tabla de logs, o migrarla si tiene un esquema anterior
+        4. Crear sus índices por timestamp y por (tag, timestamp) si no existen
+
+        Returns:
+            Connection: Conexión en modo autocommit (isolation_level=None); las escrituras
+                abren sus transacciones de forma explícita
+
+        Raises:
+            ConnectionError: Si la tabla existente tiene un esquema no soportado o
+                falla su migración
 
         Note:
-            La estructura de la tabla se define en CREATE_TABLE_QUERY y contiene:
-            - timestamp: TEXT - Marca temporal del log
-            - tag: TEXT - Nivel o categoría del log
-            - message: TEXT - Contenido del mensaje
+            La conexión se crea con check_same_thread=False porque FastAPI ejecuta las
+            tareas en un threadpool; el acceso concurrente se serializa con un Lock.
         """
-        with connect(self.__db_path) as conn:
+        conn: Connection = connect(self.__db_path, check_same_thread=False, isolation_level=None)
+        try:
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            self.__ensure_schema(conn)
+            conn.execute(self.CREATE_INDEX_QUERY.format(self.__logs_table))
+            conn.execute(self.CREATE_TAG_INDEX_QUERY.format(self.__logs_table))
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def __ensure_schema(self, conn: Connection) -> None:
+        """Crea la tabla de logs o adapta una tabla existente al esquema actual.
+
+        Revisa las columnas con PRAGMA table_info:
+        - Sin tabla: se crea con el esquema actual
+        - timestamp TEXT (ISO 8601, versiones anteriores): se migran las filas
+        - timestamp INTEGER sin utc_offset: se añade la columna; las filas existentes
+          quedan con desfase NULL, es decir, naive en UTC
+
+        Args:
+            conn (Connection): Conexión recién abierta
+
+        Raises:
+            ConnectionError: Si la tabla tiene un esquema no soportado o falla la migración
+        """
+        columns: dict[str, str] = {
+            row[1]: row[2].upper()
+            for row in conn.execute(self.TABLE_INFO_QUERY.format(self.__logs_table))
+        }
+        if not columns:
             conn.execute(self.CREATE_TABLE_QUERY.format(self.__logs_table))
-            conn.commit()
+            return
+
+        if not {"timestamp", "tag", "message"} <= columns.keys() or columns["timestamp"] not in (
+            "TEXT",
+            "INTEGER",
+        ):
+            raise ConnectionError(self.DB_SCHEMA_ERROR_MSG.format(self.__logs_table, columns))
+
+        if columns["timestamp"] == "TEXT":
+            self.__migrate_text_timestamps(conn)
+        elif "utc_offset" not in columns:
+            conn.execute(self.ADD_UTC_OFFSET_QUERY.format(self.__logs_table))
+            logger.warning("Added utc_offset column to table %s", self.__logs_table)
+
+    def __migrate_text_timestamps(self, conn: Connection) -> None:
+        """Reescribe una tabla con timestamps TEXT al esquema actual en una transacción.
+
+        Los timestamps en formato ISO se convierten a epoch micros conservando su
+        desfase UTC. Los valores numéricos (enteros guardados como TEXT por versiones
+        que ya escribían epoch micros sobre una tabla antigua) se toman tal cual.
+
+        Args:
+            conn (Connection): Conexión recién abierta
+
+        Raises:
+            ConnectionError: Si alguna fila no puede convertirse; la tabla queda intacta
+        """
+        table: str = self.__logs_table
+        migration_table: str = f"{table}__migration"
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(self.CREATE_TABLE_QUERY.format(migration_table))
+            conn.executemany(
+                self.INSERT_LOG_QUERY.format(migration_table),
+                (
+                    self.__legacy_row_to_entry(row).to_db_row()
+                    for row in conn.execute(self.SELECT_LEGACY_LOGS_QUERY.format(table))
+                ),
+            )
+            conn.execute(self.DROP_TABLE_QUERY.format(table))
+            conn.execute(self.RENAME_TABLE_QUERY.format(migration_table, table))
+            conn.execute("COMMIT")
+        except Exception as e:
+            conn.rollback()
+            raise ConnectionError(self.DB_MIGRATION_ERROR_MSG.format(table, e)) from e
+
+        logger.warning("Migrated table %s to integer timestamps", table)
+
+    @staticmethod
+    def __legacy_row_to_entry(row: tuple) -> LogEntry:
+        """Convierte una fila de una tabla con timestamps TEXT en un LogEntry.
+
+        Args:
+            row (tuple): (timestamp, tag, message) con timestamp ISO 8601 o numérico
+
+        Returns:
+            LogEntry: Log equivalente
+        """
+        raw: str = str(row[0])
+        timestamp: datetime = (
+            LogEntry.from_epoch_micros(int(raw))
+            if raw.lstrip("-").isdigit()
+            else datetime.fromisoformat(raw)
+        )
+        return LogEntry.model_construct(timestamp=timestamp, tag=row[1], message=row[2])
+
+    def warm_up(self) -> None:
+        """Prepara la consulta por rango antes de recibir tráfico.
+
+        Ejecuta GET_LOGS_QUERY sobre un rango vacío para que el statement quede en
+        la caché de sentencias de la conexión y las páginas del índice por timestamp
+        se carguen en memoria, evitando ese costo en la primera petición.
+        """
+        with self.__lock:
+            self.__conn.execute(self.__get_logs_query, (0, -1)).fetchall()
+
+    def close(self) -> None:
+        """Cierra la conexión persistente a la base de datos."""
+        with self.__lock:
+            self.__conn.close()
 
     def save_logs(self, logs: list[LogEntry] | LogEntry) -> None:
         """Guarda uno o varios logs en la base de datos SQLite.
@@ -62,7 +220,7 @@ class SQliteConn:
         Este método maneja tanto logs individuales como listas de logs:
         1. Convierte el input en una lista si es un log individual
         2. Inserta los logs en la base de datos usando una única transacción
-        3. Muestra información sobre el rango temporal de los logs guardados
+        3. Registra en el log la cantidad de logs guardados
 
         Args:
             logs (list[LogEntry] | LogEntry): Log individual o lista de logs a guardar
@@ -77,54 +235,69 @@ class SQliteConn:
             sqlite_conn.save_logs([log1, log2])  # Guarda múltiples logs
 
         Note:
-            Los timestamps se convierten a formato ISO antes de guardarse
-            para garantizar consistencia en el almacenamiento.
+            Los timestamps se guardan como microsegundos desde el epoch (INTEGER),
+            lo que reduce el tamaño del índice y evita parsear texto al leer. Su
+            desfase UTC se guarda aparte (utc_offset) para restaurarlo al leer.
         """
         if not logs:
             return
 
-        with connect(self.__db_path) as conn:
-            try:
-                logs = [logs] if not isinstance(logs, list) else logs
+        logs = [logs] if not isinstance(logs, list) else logs
 
-                insert_query: str = self.INSERT_LOG_QUERY.format(self.__logs_table)
-                conn.executemany(
-                    insert_query,
-                    [(log.timestamp.isoformat(), log.tag, log.message) for log in logs],
-                )
-                conn.commit()
-                print(
-                    f"Saved {len(logs)} logs to database "
-                    f"(from {min(logs).timestamp.isoformat()} to {max(logs).timestamp.isoformat()})"
+        with self.__lock:
+            try:
+                self.__conn.execute("BEGIN IMMEDIATE")
+                self.__conn.executemany(
+                    self.__insert_query,
+                    (log.to_db_row() for log in logs),
                 )
+                self.__conn.execute("COMMIT")
             except Exception as e:
-                conn.rollback()
+                self.__conn.rollback()
                 raise ConnectionError(self.DB_SAVE_ERROR_MSG.format(e)) from e
 
-    def get_logs(self, start_time: datetime, end_time: datetime) -> list[LogEntry]:
+        logger.info("Saved %d logs to database", len(logs))
+
+    def get_logs(
+        self, start_time: datetime, end_time: datetime, tag: str | None = None
+    ) -> list[LogEntry]:
         """Recupera logs dentro de un rango de tiempo específico.
 
+        Con un tag, la consulta usa el índice (tag, timestamp) y solo lee las filas
+        de ese tag dentro del rango.
+
         Args:
-            start_time (str): Timestamp inicial en formato ISO (YYYY-MM-DDTHH:MM:SS)
-            end_time (str): Timestamp final en formato ISO (YYYY-MM-DDTHH:MM:SS)
+            start_time (datetime): Timestamp inicial del rango (inclusive)
+            end_time (datetime): Timestamp final del rango (inclusive)
+            tag (str | None): Si se indica, solo se retornan los logs con ese tag
 
         Returns:
-            list[LogEntry]: Lista de logs encontrados en el rango especificado
+            list[LogEntry]: Lista de logs encontrados en el rango especificado, en orden temporal
 
         Raises:
-            ConnectionError: Si ocurre un error durante la consulta a la base de datos
+            ConnectionError: Si ocurre un error durante la consulta a la base de datos o
+                al convertir sus filas
         """
 
-        print(f"Searching in DB from {start_time} to {end_time}")
+        logger.debug("Searching in DB from %s to %s (tag=%s)", start_time, end_time, tag)
 
-        with connect(self.__db_path) as conn:
+        bounds: tuple[int, int] = (
+            LogEntry.to_epoch_micros(start_time),
+            LogEntry.to_epoch_micros(end_time),
+        )
+        query, params = (
+            (self.__get_logs_query, bounds)
+            if tag is None
+            else (self.__get_logs_by_tag_query, (tag, *bounds))
+        )
+
+        with self.__lock:
             try:
-                cursor: Cursor = conn.execute(
-                    self.GET_LOGS_QUERY.format(self.__logs_table),
-                    (start_time.isoformat(), end_time.isoformat()),
-                )
-                logs: list[LogEntry] = [LogEntry.from_db_row(row) for row in cursor]
+                rows: list[tuple] = self.__conn.execute(query, params).fetchall()
             except Exception as e:
                 raise ConnectionError(self.DB_RETRIEVE_ERROR_MSG.format(e)) from e
-            else:
-                return logs
+
+        try:
+            return [LogEntry.from_db_row(row) for row in rows]
+        except Exception as e:
+            raise ConnectionError(self.DB_RETRIEVE_ERROR_MSG.format(e)) from e
@@ -1,23 +1,33 @@
+from collections import OrderedDict
+from collections.abc import Iterable
 from datetime import datetime
+from operator import attrgetter
+from typing import ClassVar
 
-from sortedcontainers import SortedDict
+from sortedcontainers import SortedKeyList
 
 from src.model.log_entry import LogEntry
 from src.services.log_pruner import LogPruner
 
 
 class TemporalCache:
+    QUERY_CACHE_SIZE: ClassVar[int] = 128
+    SORT_KEY: ClassVar[attrgetter] = attrgetter("epoch_micros")
+
     def __init__(self, pruner: LogPruner):
         self.__pruner: LogPruner = pruner
-        self.__cache: SortedDict = SortedDict()
+        self.__cache: SortedKeyList = SortedKeyList(key=self.SORT_KEY)
+        self.__tag_index: dict[str, SortedKeyList] = dict()
+        self.__query_cache: OrderedDict[tuple[int, int, str | None], list[LogEntry]] = OrderedDict()
 
     def add_log(self, log_entry: LogEntry) -> "TemporalCache":
         """Añade un nuevo log al cache temporal.
 
-        Este método:
-        1. Extrae el timestamp del log
-        2. Registra el timestamp en el pruner para seguimiento
-        3. Agrupa logs por timestamp en el cache
+        El cache es un SortedKeyList ordenado por epoch_micros (una lista de sublistas
+        con un índice de máximos por bloque), por lo que insertar cuesta O(log n)
+        incluso cuando el log llega fuera de orden. Los logs con el mismo timestamp
+        se insertan después de los existentes, preservando el orden de llegada.
+        El log también se añade al índice de su tag, usado por get_logs(tag=...).
 
         Args:
             log_entry (LogEntry): Log a añadir al cache
@@ -29,26 +39,73 @@ class TemporalCache:
             cache = TemporalCache(pruner)
             cache.add_log(log1).add_log(log2)  # Encadenamiento de métodos
         """
-        timestamp: datetime = log_entry.timestamp
-        self.__pruner.register_timestamp(timestamp)
+        self.__cache.add(log_entry)
+        tag_logs: SortedKeyList | None = self.__tag_index.get(log_entry.tag)
+        if tag_logs is None:
+            tag_logs = self.__tag_index[log_entry.tag] = SortedKeyList(key=self.SORT_KEY)
+        tag_logs.add(log_entry)
+        self.__query_cache.clear()
+        return self
+
+    def bulk_add_logs(self, logs: Iterable[LogEntry]) -> "TemporalCache":
+        """Añade un lote de logs al cache temporal.
+
+        Equivale a llamar add_log por cada log, pero delega en SortedKeyList.update:
+        el lote se ordena una sola vez y, si es grande respecto al cache, se fusiona
+        con él en una ordenación en lugar de insertar log por log. La ordenación es
+        estable, así que los logs con el mismo timestamp mantienen el orden de llegada.
+
+        Args:
+            logs (Iterable[LogEntry]): Logs a añadir al cache
+
+        Returns:
+            TemporalCache: Self para permitir encadenamiento de métodos
 
-        if timestamp not in self.__cache:
-            self.__cache[timestamp] = list()
-        self.__cache[timestamp].append(log_entry)
+        Example:
+            cache = TemporalCache(pruner)
+            cache.bulk_add_logs([log1, log2, log3])
+        """
+        logs = list(logs)
+        if not logs:
+            return self
+
+        self.__cache.update(logs)
+        logs_by_tag: dict[str, list[LogEntry]] = dict()
+        for log_entry in logs:
+            logs_by_tag.setdefault(log_entry.tag, list()).append(log_entry)
+        for tag, tag_batch in logs_by_tag.items():
+            tag_logs: SortedKeyList | None = self.__tag_index.get(tag)
+            if tag_logs is None:
+                tag_logs = self.__tag_index[tag] = SortedKeyList(key=self.SORT_KEY)
+            tag_logs.update(tag_batch)
+        self.__query_cache.clear()
         return self
 
-    def get_logs(self, start_time: datetime, end_time: datetime) -> list[LogEntry]:
+    def get_logs(
+        self, start_time: datetime, end_time: datetime, tag: str | None = None
+    ) -> list[LogEntry]:
         """Obtiene logs dentro de un rango temporal específico.
 
-        Utiliza el método irange de SortedDict para obtener eficientemente
-        los logs que caen dentro del intervalo [start_time, end_time].
+        Localiza los límites del intervalo [start_time, end_time] con bisect_key_left y
+        bisect_key_right y copia el tramo con un slice del SortedKeyList, que concatena
+        las sublistas internas sin iterar log por log en Python: O(log n + k). Si se indica
+        un tag, la búsqueda se hace sobre el índice de ese tag, de modo que solo se
+        recorren los k logs que cumplen ambos filtros. start_time y end_time se
+        convierten una sola vez a microsegundos, así que la búsqueda binaria compara
+        enteros en lugar de datetimes.
+
+        Los resultados se memorizan (LRU de QUERY_CACHE_SIZE consultas) hasta la
+        siguiente inserción o limpieza, por lo que repetir la misma consulta mientras
+        el cache no cambia cuesta una búsqueda en un diccionario.
 
         Args:
             start_time (datetime): Inicio del rango temporal (inclusive)
             end_time (datetime): Fin del rango temporal (inclusive)
+            tag (str | None): Si se indica, solo se retornan los logs con ese tag
 
         Returns:
-            list[LogEntry]: Lista de logs dentro del rango especificado
+            list[LogEntry]: Lista de logs dentro del rango especificado. La lista puede
+                ser compartida entre consultas iguales, por lo que no debe modificarse
 
         Example:
             logs = cache.get_logs(
@@ -56,10 +113,22 @@ class TemporalCache:
                 datetime(2023, 4, 23, 10, 5)
             )
         """
-        logs: list[LogEntry] = list()
-        for timestamp in self.__cache.irange(start_time, end_time, inclusive=(True, True)):
-            for log in self.__cache[timestamp]:
-                logs.append(log)
+        start: int = LogEntry.to_epoch_micros(start_time)
+        end: int = LogEntry.to_epoch_micros(end_time)
+        key: tuple[int, int, str | None] = (start, end, tag)
+        logs: list[LogEntry] | None = self.__query_cache.get(key)
+        if logs is not None:
+            self.__query_cache.move_to_end(key)
+            return logs
+
+        index: SortedKeyList | None = self.__cache if tag is None else self.__tag_index.get(tag)
+        logs = (
+            index[index.bisect_key_left(start) : index.bisect_key_right(end)] if index else list()
+        )
+
+        self.__query_cache[key] = logs
+        if len(self.__query_cache) > self.QUERY_CACHE_SIZE:
+            self.__query_cache.popitem(last=False)
         return logs
 
     def get_all_logs(self) -> list[LogEntry]:
@@ -69,14 +138,24 @@ class TemporalCache:
             list[LogEntry]: Lista con todos los logs en orden temporal
 
         Note:
-            Los logs se devuelven en el orden en que fueron almacenados
-            debido a que SortedDict mantiene las claves ordenadas.
+            Los logs se mantienen ordenados por timestamp desde su inserción,
+            por lo que basta con copiar el SortedKeyList con un slice, que concatena
+            sus sublistas internas en lugar de iterarlo log por log.
         """
-        logs: list[LogEntry] = list()
-        for timestamp in self.__cache:
-            logs.extend(self.__cache[timestamp])
+        logs: list[LogEntry] = self.__cache[:]
         return logs
 
+    def prune_due(self) -> bool:
+        """Indica si prune_cache eliminaría algún log.
+
+        Permite diferir la limpieza hasta que el log más antiguo salga de la
+        ventana temporal, en lugar de programarla en cada inserción.
+
+        Returns:
+            bool: True si hay logs fuera de la ventana temporal
+        """
+        return self.__pruner.is_due(self.__cache)
+
     def prune_cache(self) -> list[LogEntry]:
         """Ejecuta la limpieza del cache eliminando logs antiguos.
 
@@ -84,6 +163,10 @@ class TemporalCache:
         que determina qué logs deben ser eliminados basándose en
         la ventana temporal configurada.
 
+        Los índices por tag se recortan hasta el timestamp del último log eliminado:
+        como el pruner elimina un prefijo del cache, ese mismo prefijo es el que
+        sobra en cada índice.
+
         Returns:
             list[LogEntry]: Lista de logs que fueron eliminados del cache
 
@@ -91,4 +174,25 @@ class TemporalCache:
             Los logs eliminados se guardan en una base de datos
             para mantener un historial completo.
         """
-        return self.__pruner.prune(self.__cache)
+        pruned_logs: list[LogEntry] = self.__pruner.prune(self.__cache)
+        if pruned_logs:
+            self.__prune_tag_index(pruned_logs[-1].epoch_micros)
+            self.__query_cache.clear()
+        return pruned_logs
+
+    def __prune_tag_index(self, threshold: int) -> "TemporalCache":
+        """Elimina de los índices por tag los logs con epoch_micros <= threshold.
+
+        Los índices que quedan vacíos se descartan.
+
+        Args:
+            threshold (int): epoch_micros del último log eliminado del cache
+
+        Returns:
+            TemporalCache: Self para permitir encadenamiento de métodos
+        """
+        for tag, tag_logs in list(self.__tag_index.items()):
+            del tag_logs[: tag_logs.bisect_key_right(threshold)]
+            if not tag_logs:
+                del self.__tag_index[tag]
+        return self
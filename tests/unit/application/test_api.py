@@ -1,5 +1,7 @@
+from collections.abc import Iterator
 from datetime import datetime
 from http import HTTPStatus
+from threading import Event
 from unittest.mock import Mock
 
 import pytest
@@ -15,6 +17,7 @@ SAMPLE_TIMESTAMP = "2023-04-23T10:00:00"
 SAMPLE_LOG = {"timestamp": SAMPLE_TIMESTAMP, "tag": "INFO", "message": "Test log"}
 MULTIPLE_LOGS_COUNT = 2
 SINGLE_LOG_COUNT = 1
+WAIT_TIMEOUT_S = 2.0
 
 HTTP_201_CREATED = HTTPStatus.CREATED
 HTTP_200_OK = HTTPStatus.OK
@@ -23,13 +26,18 @@ HTTP_200_OK = HTTPStatus.OK
 @pytest.fixture
 def mock_cache() -> Mock:
     """Creates a mock TemporalCache."""
-    return Mock(spec=TemporalCache)
+    cache = Mock(spec=TemporalCache)
+    cache.prune_due.return_value = True
+    cache.prune_cache.return_value = []
+    return cache
 
 
 @pytest.fixture
 def mock_db() -> Mock:
     """Creates a mock SQLiteConn."""
-    return Mock(spec=SQliteConn)
+    db = Mock(spec=SQliteConn)
+    db.get_logs.return_value = []
+    return db
 
 
 @pytest.fixture
@@ -39,9 +47,10 @@ def api(mock_cache: Mock, mock_db: Mock) -> API:
 
 
 @pytest.fixture
-def client(api: API) -> TestClient:
-    """Creates a TestClient for the FastAPI app."""
-    return TestClient(api.app)
+def client(api: API) -> Iterator[TestClient]:
+    """Creates a TestClient for the FastAPI app, running its startup/shutdown events."""
+    with TestClient(api.app) as client:
+        yield client
 
 
 def test_add_single_log(client: TestClient, mock_cache: Mock) -> None:
@@ -57,11 +66,24 @@ def test_add_multiple_logs(client: TestClient, mock_cache: Mock) -> None:
     """Test adding multiple logs."""
     logs = {"logs": [SAMPLE_LOG, SAMPLE_LOG]}
 
-    response = client.post("/logs", json=logs)
+    response = client.post("/logs/batch", json=logs)
 
     assert response.status_code == HTTP_201_CREATED
     assert response.json()["count"] == MULTIPLE_LOGS_COUNT
-    assert mock_cache.add_log.call_count == MULTIPLE_LOGS_COUNT
+    mock_cache.bulk_add_logs.assert_called_once()
+    assert len(mock_cache.bulk_add_logs.call_args.args[0]) == MULTIPLE_LOGS_COUNT
+
+
+def test_add_logs_rejects_mismatched_payloads(client: TestClient, mock_cache: Mock) -> None:
+    """Test that each ingest route only accepts its own payload shape."""
+    assert client.post("/logs", json={"logs": [SAMPLE_LOG]}).status_code == (
+        HTTPStatus.UNPROCESSABLE_ENTITY
+    )
+    assert client.post("/logs/batch", json=SAMPLE_LOG).status_code == (
+        HTTPStatus.UNPROCESSABLE_ENTITY
+    )
+    mock_cache.add_log.assert_not_called()
+    mock_cache.bulk_add_logs.assert_not_called()
 
 
 def test_get_logs_from_cache(client: TestClient, mock_cache: Mock) -> None:
@@ -75,12 +97,13 @@ def test_get_logs_from_cache(client: TestClient, mock_cache: Mock) -> None:
     )
 
     assert response.status_code == HTTP_200_OK
-    assert len(response.json()["logs"]) == SINGLE_LOG_COUNT
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"logs": [SAMPLE_LOG]}
     mock_cache.get_logs.assert_called_once()
 
 
-def test_get_logs_fallback_to_db(client: TestClient, mock_cache: Mock, mock_db: Mock) -> None:
-    """Test fallback to database when cache misses."""
+def test_get_logs_from_db(client: TestClient, mock_cache: Mock, mock_db: Mock) -> None:
+    """Test retrieving logs from the database when the cache has none in range."""
     mock_cache.get_logs.return_value = []
     mock_db.get_logs.return_value = [
         LogEntry(timestamp=datetime.fromisoformat(SAMPLE_TIMESTAMP), tag="INFO", message="Test log")
@@ -96,6 +119,69 @@ def test_get_logs_fallback_to_db(client: TestClient, mock_cache: Mock, mock_db:
     mock_db.get_logs.assert_called_once()
 
 
+def test_get_logs_merges_cache_and_db(client: TestClient, mock_cache: Mock, mock_db: Mock) -> None:
+    """Test that a range spanning cache and database returns both, in timestamp order."""
+    mock_cache.get_logs.return_value = [
+        LogEntry(timestamp=datetime(2023, 4, 23, 10, 2), tag="INFO", message="cache"),
+    ]
+    mock_db.get_logs.return_value = [
+        LogEntry(timestamp=datetime(2023, 4, 23, 10, 1), tag="INFO", message="db early"),
+        LogEntry(timestamp=datetime(2023, 4, 23, 10, 3), tag="INFO", message="db late"),
+    ]
+
+    response = client.get(
+        "/logs", params={"start_time": SAMPLE_TIMESTAMP, "end_time": "2023-04-23T10:05:00"}
+    )
+
+    assert response.status_code == HTTP_200_OK
+    assert [log["message"] for log in response.json()["logs"]] == [
+        "db early",
+        "cache",
+        "db late",
+    ]
+
+
+def test_get_logs_queries_db_while_reading_cache(
+    client: TestClient, mock_cache: Mock, mock_db: Mock
+) -> None:
+    """Test that the database query is already running while the cache is being read."""
+    db_started = Event()
+    cache_saw_db_running: list[bool] = []
+
+    def db_get_logs(*args: object) -> list[LogEntry]:
+        db_started.set()
+        return []
+
+    def cache_get_logs(*args: object) -> list[LogEntry]:
+        cache_saw_db_running.append(db_started.wait(WAIT_TIMEOUT_S))
+        return []
+
+    mock_db.get_logs.side_effect = db_get_logs
+    mock_cache.get_logs.side_effect = cache_get_logs
+
+    response = client.get(
+        "/logs", params={"start_time": SAMPLE_TIMESTAMP, "end_time": SAMPLE_TIMESTAMP}
+    )
+
+    assert response.status_code == HTTP_200_OK
+    assert cache_saw_db_running == [True]
+
+
+def test_get_logs_forwards_tag(client: TestClient, mock_cache: Mock, mock_db: Mock) -> None:
+    """Test that the tag query parameter filters both the cache and the database."""
+    start, end = datetime.fromisoformat(SAMPLE_TIMESTAMP), datetime.fromisoformat(SAMPLE_TIMESTAMP)
+    mock_cache.get_logs.return_value = []
+
+    response = client.get(
+        "/logs",
+        params={"start_time": SAMPLE_TIMESTAMP, "end_time": SAMPLE_TIMESTAMP, "tag": "ERROR"},
+    )
+
+    assert response.status_code == HTTP_200_OK
+    mock_cache.get_logs.assert_called_once_with(start, end, "ERROR")
+    mock_db.get_logs.assert_called_once_with(start, end, "ERROR")
+
+
 def test_get_all_logs(client: TestClient, mock_cache: Mock) -> None:
     """Test retrieving all logs from cache."""
     mock_cache.get_all_logs.return_value = [
@@ -109,14 +195,51 @@ def test_get_all_logs(client: TestClient, mock_cache: Mock) -> None:
     mock_cache.get_all_logs.assert_called_once()
 
 
-def test_background_pruning(client: TestClient, mock_cache: Mock, mock_db: Mock) -> None:
-    """Test that pruning happens in background after adding logs."""
+def test_background_pruning(api: API, mock_cache: Mock, mock_db: Mock) -> None:
+    """Test that pruned logs are persisted by the batch writer after adding logs."""
+    pruned_logs = [
+        LogEntry(timestamp=datetime.fromisoformat(SAMPLE_TIMESTAMP), tag="INFO", message="Old log")
+    ]
+    mock_cache.prune_cache.return_value = pruned_logs
+
+    with TestClient(api.app) as client:  # shutdown flushes the pending batch
+        response = client.post("/logs", json=SAMPLE_LOG)
+
+    assert response.status_code == HTTP_201_CREATED
+    mock_cache.prune_cache.assert_called_once()
+    mock_db.save_logs.assert_called_once_with(pruned_logs)
+
+
+def test_shutdown_closes_db_after_flush(api: API, mock_cache: Mock, mock_db: Mock) -> None:
+    """Test that shutdown flushes pending logs before closing the database connection."""
     mock_cache.prune_cache.return_value = [
         LogEntry(timestamp=datetime.fromisoformat(SAMPLE_TIMESTAMP), tag="INFO", message="Old log")
     ]
 
+    with TestClient(api.app) as client:
+        client.post("/logs", json=SAMPLE_LOG)
+        mock_db.close.assert_not_called()
+
+    assert [name for name, _, _ in mock_db.method_calls] == ["warm_up", "save_logs", "close"]
+
+
+def test_pruning_runs_after_response(api: API, mock_cache: Mock) -> None:
+    """Test that pruning is deferred until after the logs are added to the cache."""
+    with TestClient(api.app) as client:
+        client.post("/logs", json=SAMPLE_LOG)
+
+    assert [name for name, _, _ in mock_cache.method_calls] == [
+        "add_log",
+        "prune_due",
+        "prune_cache",
+    ]
+
+
+def test_pruning_skipped_when_not_due(client: TestClient, mock_cache: Mock) -> None:
+    """Test that no background pruning is scheduled while every log is inside the window."""
+    mock_cache.prune_due.return_value = False
+
     response = client.post("/logs", json=SAMPLE_LOG)
 
     assert response.status_code == HTTP_201_CREATED
-    mock_cache.prune_cache.assert_called_once()
-    mock_db.save_logs.assert_called_once()
+    mock_cache.prune_cache.assert_not_called()
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import UTC, datetime, timedelta, timezone
 
 import pytest
 from pydantic_core import ValidationError
@@ -9,6 +9,7 @@ from src.model.log_entry import LogEntry
 SAMPLE_TIMESTAMP = "2023-04-23T10:00:00"
 SAMPLE_TAG = "INFO"
 SAMPLE_MESSAGE = "Test message"
+SAMPLE_EPOCH_MICROS = 1682244000000000  # 2023-04-23T10:00:00 UTC
 
 
 @pytest.fixture
@@ -48,12 +49,55 @@ def test_log_entry_comparison() -> None:
 
 def test_log_entry_from_db_row() -> None:
     """Test creating LogEntry from database row."""
-    db_row = (SAMPLE_TIMESTAMP, SAMPLE_TAG, SAMPLE_MESSAGE)
+    db_row = (SAMPLE_EPOCH_MICROS, SAMPLE_TAG, SAMPLE_MESSAGE, None)
     log = LogEntry.from_db_row(db_row)
 
     assert log.timestamp == datetime.fromisoformat(SAMPLE_TIMESTAMP)
     assert log.tag == SAMPLE_TAG
     assert log.message == SAMPLE_MESSAGE
+    assert log.epoch_micros == SAMPLE_EPOCH_MICROS
+
+
+def test_epoch_micros_precomputed(sample_log_entry: LogEntry) -> None:
+    """Test that validated entries carry their timestamp as epoch microseconds."""
+    assert sample_log_entry.epoch_micros == SAMPLE_EPOCH_MICROS
+
+
+def test_epoch_micros_round_trip() -> None:
+    """Test conversion between naive timestamps and epoch microseconds."""
+    timestamp = datetime(2023, 4, 23, 10, 0, 0, 123456)
+
+    micros = LogEntry.to_epoch_micros(timestamp)
+
+    assert micros == SAMPLE_EPOCH_MICROS + 123456
+    assert LogEntry.from_epoch_micros(micros) == timestamp
+
+
+def test_epoch_micros_normalizes_aware_timestamps() -> None:
+    """Test that timezone-aware timestamps are normalized to UTC."""
+    aware = datetime(2023, 4, 23, 5, 0, tzinfo=timezone(timedelta(hours=-5)))
+
+    assert LogEntry.to_epoch_micros(aware) == SAMPLE_EPOCH_MICROS
+    assert LogEntry.to_epoch_micros(aware.astimezone(UTC)) == SAMPLE_EPOCH_MICROS
+
+
+def test_db_row_round_trip_keeps_utc_offset() -> None:
+    """Test that an aware timestamp comes back from a DB row with its original offset."""
+    aware = datetime(2023, 4, 23, 5, 0, tzinfo=timezone(timedelta(hours=-5)))
+    log = LogEntry(timestamp=aware, tag=SAMPLE_TAG, message=SAMPLE_MESSAGE)
+
+    restored = LogEntry.from_db_row(log.to_db_row())
+
+    assert restored.timestamp.isoformat() == "2023-04-23T05:00:00-05:00"
+    assert restored.epoch_micros == SAMPLE_EPOCH_MICROS
+
+
+def test_tags_are_interned() -> None:
+    """Test that logs with equal tags share a single tag string."""
+    first = LogEntry(timestamp=datetime.now(), tag="".join(["IN", "FO"]), message="first")
+    second = LogEntry(timestamp=datetime.now(), tag="".join(["IN", "FO"]), message="second")
+
+    assert first.tag is second.tag
 
 
 def test_invalid_comparison() -> None:
@@ -0,0 +1,137 @@
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import datetime
+from unittest.mock import Mock, call
+
+import pytest
+import pytest_asyncio
+
+from src.model.log_entry import LogEntry
+from src.services.batch_writer import BatchWriter
+from src.services.sqlite_conn import SQliteConn
+
+MAX_BATCH_SIZE = 2
+FLUSH_INTERVAL_MS = 10
+WAIT_TIMEOUT_S = 2.0
+
+
+@pytest.fixture
+def mock_db() -> Mock:
+    return Mock(spec=SQliteConn)
+
+
+@pytest_asyncio.fixture
+async def batch_writer(mock_db: Mock) -> AsyncIterator[BatchWriter]:
+    writer: BatchWriter = BatchWriter(
+        db_service=mock_db, max_batch_size=MAX_BATCH_SIZE, flush_interval_ms=FLUSH_INTERVAL_MS
+    )
+    await writer.start()
+    yield writer
+    await writer.stop()
+
+
+@pytest.fixture
+def sample_log() -> LogEntry:
+    return LogEntry(timestamp=datetime(2023, 1, 1, 10, 0), message="log1", tag="INFO")
+
+
+async def wait_for_calls(mock: Mock, count: int) -> None:
+    """Waits until the mock has been called `count` times, failing after WAIT_TIMEOUT_S."""
+    async with asyncio.timeout(WAIT_TIMEOUT_S):
+        while mock.call_count < count:
+            await asyncio.sleep(FLUSH_INTERVAL_MS / 1000)
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending(mock_db: Mock, sample_log: LogEntry) -> None:
+    """Test that stopping the writer persists the logs still in the buffer"""
+    writer: BatchWriter = BatchWriter(db_service=mock_db, flush_interval_ms=60_000)
+    await writer.start()
+    writer.submit([sample_log])
+    await writer.stop()
+
+    mock_db.save_logs.assert_called_once_with([sample_log])
+
+
+@pytest.mark.asyncio
+async def test_submit_starts_writer_lazily(mock_db: Mock, sample_log: LogEntry) -> None:
+    """Test that submitting to a writer that was never started does not lose logs"""
+    writer: BatchWriter = BatchWriter(db_service=mock_db)
+    writer.submit([sample_log])
+    await writer.stop()
+
+    mock_db.save_logs.assert_called_once_with([sample_log])
+
+
+@pytest.mark.asyncio
+async def test_flush_on_batch_size(mock_db: Mock, sample_log: LogEntry) -> None:
+    """Test that reaching max_batch_size flushes all pending logs in one call"""
+    writer: BatchWriter = BatchWriter(
+        db_service=mock_db, max_batch_size=MAX_BATCH_SIZE, flush_interval_ms=60_000
+    )
+    await writer.start()
+    try:
+        writer.submit([sample_log]).submit([sample_log])
+        await wait_for_calls(mock_db.save_logs, 1)
+    finally:
+        await writer.stop()
+
+    mock_db.save_logs.assert_called_once_with([sample_log] * MAX_BATCH_SIZE)
+
+
+@pytest.mark.asyncio
+async def test_flush_on_interval(
+    batch_writer: BatchWriter, mock_db: Mock, sample_log: LogEntry
+) -> None:
+    """Test that pending logs are flushed once the flush interval elapses"""
+    batch_writer.submit([sample_log])
+    await wait_for_calls(mock_db.save_logs, 1)
+
+    mock_db.save_logs.assert_called_once_with([sample_log])
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried(
+    batch_writer: BatchWriter, mock_db: Mock, sample_log: LogEntry
+) -> None:
+    """Test that a failing flush keeps both the writer task and the failed batch"""
+    mock_db.save_logs.side_effect = [ConnectionError("boom"), None]
+    batch_writer.submit([sample_log])
+    await wait_for_calls(mock_db.save_logs, 2)
+
+    assert mock_db.save_logs.call_args_list == [call([sample_log]), call([sample_log])]
+
+
+@pytest.mark.asyncio
+async def test_cancel_flushes_pending(mock_db: Mock, sample_log: LogEntry) -> None:
+    """Test that cancelling the writer task persists pending logs and finishes the task"""
+    writer: BatchWriter = BatchWriter(db_service=mock_db, flush_interval_ms=60_000)
+    writer.submit([sample_log])
+    await asyncio.sleep(0)  # let the writer pick the batch from the queue
+    task: asyncio.Task[None] = writer._BatchWriter__task  # type: ignore[attr-defined]
+    task.cancel()
+
+    async with asyncio.timeout(WAIT_TIMEOUT_S):
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    mock_db.save_logs.assert_called_once_with([sample_log])
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_backs_off(mock_db: Mock, sample_log: LogEntry) -> None:
+    """Test that after a failed flush, reaching max_batch_size waits for the next interval"""
+    flushed_sizes: list[int] = list()
+
+    def failing_save(batch: list[LogEntry]) -> None:
+        flushed_sizes.append(len(batch))
+        raise ConnectionError("boom")
+
+    mock_db.save_logs.side_effect = failing_save
+    writer: BatchWriter = BatchWriter(
+        db_service=mock_db, max_batch_size=MAX_BATCH_SIZE, flush_interval_ms=60_000
+    )
+    writer.submit([sample_log] * MAX_BATCH_SIZE).submit([sample_log]).submit([sample_log])
+    await writer.stop()
+
+    # one size-triggered attempt, then nothing until the final flush on stop
+    assert flushed_sizes == [MAX_BATCH_SIZE, MAX_BATCH_SIZE + 2]
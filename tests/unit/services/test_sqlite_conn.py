@@ -0,0 +1,209 @@
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from sqlite3 import connect
+
+import pytest
+
+from src.model.log_entry import LogEntry
+from src.services.sqlite_conn import SQliteConn
+
+SAMPLE_LOGS_COUNT = 3
+LEGACY_CREATE_TABLE_QUERY = "CREATE TABLE logs (timestamp TEXT NOT NULL, tag TEXT, message TEXT)"
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    path: Path = tmp_path / "logs.db"
+    path.touch()
+    return path
+
+
+@pytest.fixture
+def sqlite_conn(db_path: Path) -> Iterator[SQliteConn]:
+    conn: SQliteConn = SQliteConn(db_path=str(db_path))
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def sample_logs() -> list[LogEntry]:
+    return [
+        LogEntry(timestamp=datetime(2023, 1, 1, 10, 0), message="log1", tag="INFO"),
+        LogEntry(timestamp=datetime(2023, 1, 1, 11, 0), message="log2", tag="ERROR"),
+        LogEntry(timestamp=datetime(2023, 1, 1, 12, 0), message="log3", tag="INFO"),
+    ]
+
+
+def test_non_existent_path(tmp_path: Path) -> None:
+    """Test that a missing database file is rejected"""
+    with pytest.raises(AssertionError):
+        SQliteConn(db_path=str(tmp_path / "missing.db"))
+
+
+def test_wal_journal_mode(sqlite_conn: SQliteConn, db_path: Path) -> None:
+    """Test that the persistent connection switches the database to WAL"""
+    with connect(db_path) as conn:
+        (journal_mode,) = conn.execute("PRAGMA journal_mode").fetchone()
+    assert journal_mode == "wal"
+
+
+def test_range_query_uses_timestamp_index(sqlite_conn: SQliteConn, db_path: Path) -> None:
+    """Test that range queries are served by the timestamp index instead of a full scan"""
+    query: str = SQliteConn.GET_LOGS_QUERY.format("logs")
+    with connect(db_path) as conn:
+        plan: list[tuple] = conn.execute(f"EXPLAIN QUERY PLAN {query}", ("a", "b")).fetchall()
+    assert any("idx_logs_timestamp" in row[-1] for row in plan)
+
+
+def test_tag_query_uses_tag_index(sqlite_conn: SQliteConn, db_path: Path) -> None:
+    """Test that tag-filtered range queries are served by the (tag, timestamp) index"""
+    query: str = SQliteConn.GET_LOGS_BY_TAG_QUERY.format("logs")
+    with connect(db_path) as conn:
+        plan: list[tuple] = conn.execute(f"EXPLAIN QUERY PLAN {query}", ("a", 0, 1)).fetchall()
+    assert any("idx_logs_tag_timestamp" in row[-1] for row in plan)
+
+
+def test_get_logs_by_tag(sqlite_conn: SQliteConn, sample_logs: list[LogEntry]) -> None:
+    """Test that a tag filter only returns the logs with that tag"""
+    sqlite_conn.save_logs(sample_logs)
+
+    logs: list[LogEntry] = sqlite_conn.get_logs(datetime(2023, 1, 1), datetime(2023, 1, 2), "INFO")
+
+    assert [log.message for log in logs] == ["log1", "log3"]
+
+
+def test_save_and_get_logs(sqlite_conn: SQliteConn, sample_logs: list[LogEntry]) -> None:
+    """Test that saved logs can be retrieved by time range"""
+    sqlite_conn.save_logs(sample_logs)
+
+    logs: list[LogEntry] = sqlite_conn.get_logs(
+        datetime(2023, 1, 1, 10, 0), datetime(2023, 1, 1, 11, 0)
+    )
+    assert [log.message for log in logs] == ["log1", "log2"]
+    assert len(sqlite_conn.get_logs(datetime(2023, 1, 1), datetime(2023, 1, 2))) == (
+        SAMPLE_LOGS_COUNT
+    )
+
+
+def test_save_single_log(sqlite_conn: SQliteConn, sample_logs: list[LogEntry]) -> None:
+    """Test that a single LogEntry is accepted by save_logs"""
+    sqlite_conn.save_logs(sample_logs[0])
+
+    logs: list[LogEntry] = sqlite_conn.get_logs(datetime(2023, 1, 1), datetime(2023, 1, 2))
+    assert logs == [sample_logs[0]]
+
+
+def test_save_logs_persists_across_connections(
+    sqlite_conn: SQliteConn, sample_logs: list[LogEntry], db_path: Path
+) -> None:
+    """Test that saved logs are committed and visible to other connections"""
+    sqlite_conn.save_logs(sample_logs)
+
+    with connect(db_path) as conn:
+        (count,) = conn.execute("SELECT COUNT(*) FROM logs").fetchone()
+    assert count == SAMPLE_LOGS_COUNT
+
+
+def test_timestamps_stored_as_integers(
+    sqlite_conn: SQliteConn, sample_logs: list[LogEntry], db_path: Path
+) -> None:
+    """Test that timestamps are persisted as INTEGER epoch microseconds"""
+    sqlite_conn.save_logs(sample_logs[0])
+
+    with connect(db_path) as conn:
+        (timestamp,) = conn.execute("SELECT timestamp FROM logs").fetchone()
+    assert timestamp == LogEntry.to_epoch_micros(sample_logs[0].timestamp)
+
+
+def test_warm_up(sqlite_conn: SQliteConn, sample_logs: list[LogEntry]) -> None:
+    """Test that warming up runs without touching stored logs"""
+    sqlite_conn.save_logs(sample_logs)
+    sqlite_conn.warm_up()
+
+    assert len(sqlite_conn.get_logs(datetime(2023, 1, 1), datetime(2023, 1, 2))) == (
+        SAMPLE_LOGS_COUNT
+    )
+
+
+def test_save_empty_logs(sqlite_conn: SQliteConn) -> None:
+    """Test that saving an empty batch is a no-op"""
+    sqlite_conn.save_logs([])
+    assert sqlite_conn.get_logs(datetime(2023, 1, 1), datetime(2023, 1, 2)) == []
+
+
+def test_aware_timestamps_keep_their_offset(sqlite_conn: SQliteConn) -> None:
+    """Test that a timezone-aware log is read back with the offset it was saved with"""
+    aware = datetime(2023, 1, 1, 5, 0, tzinfo=timezone(timedelta(hours=-5)))
+    sqlite_conn.save_logs(LogEntry(timestamp=aware, message="aware", tag="INFO"))
+
+    (log,) = sqlite_conn.get_logs(datetime(2023, 1, 1), datetime(2023, 1, 2))
+
+    assert log.timestamp.isoformat() == "2023-01-01T05:00:00-05:00"
+
+
+def test_migrates_text_timestamps(db_path: Path) -> None:
+    """Test that a table from the TEXT-timestamp schema is migrated on startup"""
+    with connect(db_path) as conn:
+        conn.execute(LEGACY_CREATE_TABLE_QUERY)
+        conn.executemany(
+            "INSERT INTO logs VALUES (?, ?, ?)",
+            [
+                ("2023-01-01T10:00:00", "INFO", "naive"),
+                ("2023-01-01T06:00:00-05:00", "INFO", "aware"),
+                (LogEntry.to_epoch_micros(datetime(2023, 1, 1, 12, 0)), "INFO", "integer"),
+            ],
+        )
+
+    sqlite_conn = SQliteConn(db_path=str(db_path))
+    logs = sqlite_conn.get_logs(datetime(2023, 1, 1), datetime(2023, 1, 2))
+    sqlite_conn.close()
+
+    assert [log.timestamp.isoformat() for log in logs] == [
+        "2023-01-01T10:00:00",
+        "2023-01-01T06:00:00-05:00",
+        "2023-01-01T12:00:00",
+    ]
+    with connect(db_path) as conn:
+        column_types = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(logs)")}
+    assert column_types["timestamp"] == "INTEGER"
+    assert "utc_offset" in column_types
+
+
+def test_adds_utc_offset_column(db_path: Path) -> None:
+    """Test that an integer-timestamp table without utc_offset gains the column"""
+    with connect(db_path) as conn:
+        conn.execute("CREATE TABLE logs (timestamp INTEGER NOT NULL, tag TEXT, message TEXT)")
+        conn.execute(
+            "INSERT INTO logs VALUES (?, 'INFO', 'old')",
+            (LogEntry.to_epoch_micros(datetime(2023, 1, 1, 10, 0)),),
+        )
+
+    sqlite_conn = SQliteConn(db_path=str(db_path))
+    (log,) = sqlite_conn.get_logs(datetime(2023, 1, 1), datetime(2023, 1, 2))
+    sqlite_conn.close()
+
+    assert log.timestamp == datetime(2023, 1, 1, 10, 0)
+
+
+def test_unsupported_schema_fails_fast(db_path: Path) -> None:
+    """Test that an unknown table layout is rejected at startup"""
+    with connect(db_path) as conn:
+        conn.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, payload BLOB)")
+
+    with pytest.raises(ConnectionError):
+        SQliteConn(db_path=str(db_path))
+
+
+def test_failed_migration_keeps_table(db_path: Path) -> None:
+    """Test that a migration that cannot convert a row leaves the old table intact"""
+    with connect(db_path) as conn:
+        conn.execute(LEGACY_CREATE_TABLE_QUERY)
+        conn.execute("INSERT INTO logs VALUES ('not a timestamp', 'INFO', 'bad')")
+
+    with pytest.raises(ConnectionError):
+        SQliteConn(db_path=str(db_path))
+
+    with connect(db_path) as conn:
+        (timestamp,) = conn.execute("SELECT timestamp FROM logs").fetchone()
+    assert timestamp == "not a timestamp"
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import UTC, datetime
 from unittest.mock import Mock
 
 import pytest
@@ -7,45 +7,58 @@ from src.model.log_entry import LogEntry
 from src.services.log_pruner import LogPruner
 from src.services.temporal_cache import TemporalCache
 
-LOGS_IN_RANGE: int = 3
 TOTAL_SAMPLE_LOGS: int = 4
 LOGS_WITH_SAME_TIMESTAMP: int = 2
-BOUNDARY_LOGS_COUNT: int = 2
 
 
-@pytest.fixture
-def mock_pruner() -> Mock:
-    return Mock(spec=LogPruner)
+class _StubPruner:
+    """Stand-in for LogPruner whose methods are plain Mocks.
+
+    Cheaper to build than Mock(spec=LogPruner), which introspects the class on
+    every test, while keeping the same assertion surface.
+    """
+
+    def __init__(self) -> None:
+        self.prune = Mock()
+        self.is_due = Mock()
 
 
 @pytest.fixture
-def temporal_cache(mock_pruner: Mock) -> TemporalCache:
-    return TemporalCache(mock_pruner)
+def mock_pruner() -> _StubPruner:
+    return _StubPruner()
 
 
 @pytest.fixture
-def sample_logs() -> list[LogEntry]:
-    return [
+def temporal_cache(mock_pruner: _StubPruner) -> TemporalCache:
+    return TemporalCache(mock_pruner)  # type: ignore[arg-type]
+
+
+@pytest.fixture(scope="module")
+def sample_logs() -> tuple[LogEntry, ...]:
+    return (
         LogEntry(timestamp=datetime(2023, 1, 1, 10, 0), message="log1", tag="INFO"),
         LogEntry(timestamp=datetime(2023, 1, 1, 10, 0), message="log2", tag="INFO"),
         LogEntry(timestamp=datetime(2023, 1, 1, 11, 0), message="log3", tag="ERROR"),
         LogEntry(timestamp=datetime(2023, 1, 1, 12, 0), message="log4", tag="INFO"),
-    ]
+    )
 
 
-def test_add_log_registers_timestamp(temporal_cache: TemporalCache, mock_pruner: Mock) -> None:
-    """Test that adding a log registers its timestamp with the pruner.
+def test_add_log_does_not_touch_pruner(
+    temporal_cache: TemporalCache, mock_pruner: _StubPruner
+) -> None:
+    """Test that adding a log does not call into the pruner.
 
     Args:
         temporal_cache (TemporalCache): The temporal cache instance under test
-        mock_pruner (Mock): Mock pruner to verify timestamp registration
+        mock_pruner (_StubPruner): Mock pruner to verify no calls are made
 
-    Tests that when a log is added, its timestamp is properly registered
-    with the pruner for tracking purposes.
+    The pruner reads timestamps straight from the sorted cache, so no
+    per-insert bookkeeping is required.
     """
     log: LogEntry = LogEntry(timestamp=datetime(2023, 1, 1), message="test", tag="INFO")
     temporal_cache.add_log(log)
-    mock_pruner.register_timestamp.assert_called_once_with(log.timestamp)
+    mock_pruner.prune.assert_not_called()
+    mock_pruner.is_due.assert_not_called()
 
 
 def test_add_log_returns_self(temporal_cache: TemporalCache) -> None:
@@ -75,35 +88,63 @@ def test_get_logs_empty_cache(temporal_cache: TemporalCache) -> None:
     assert temporal_cache.get_logs(start, end) == []
 
 
-def test_get_logs_within_range(temporal_cache: TemporalCache, sample_logs: list[LogEntry]) -> None:
-    """Test retrieving logs within a specific time range.
+@pytest.mark.parametrize(
+    ("start", "end", "expected_messages"),
+    [
+        pytest.param(
+            datetime(2023, 1, 1, 10, 0),
+            datetime(2023, 1, 1, 11, 0),
+            ["log1", "log2", "log3"],
+            id="exact-boundaries",
+        ),
+        pytest.param(
+            datetime(2023, 1, 1, 9, 59),
+            datetime(2023, 1, 1, 10, 30),
+            ["log1", "log2"],
+            id="partial-overlap",
+        ),
+        pytest.param(
+            datetime(2023, 1, 1, 12, 0),
+            datetime(2023, 1, 1, 12, 0),
+            ["log4"],
+            id="single-instant",
+        ),
+        pytest.param(
+            datetime(2023, 1, 1, 12, 1),
+            datetime(2023, 1, 1, 13, 0),
+            [],
+            id="after-last-log",
+        ),
+    ],
+)
+def test_get_logs_range(
+    temporal_cache: TemporalCache,
+    sample_logs: tuple[LogEntry, ...],
+    start: datetime,
+    end: datetime,
+    expected_messages: list[str],
+) -> None:
+    """Test that range queries return exactly the logs in [start, end], in order.
 
     Args:
         temporal_cache (TemporalCache): The temporal cache instance under test
-        sample_logs (list[LogEntry]): Predefined sample logs for testing
-
-    Verifies that only logs within the specified time range are returned
-    and in the correct order.
+        sample_logs (tuple[LogEntry, ...]): Predefined sample logs for testing
+        start (datetime): Inclusive start of the queried range
+        end (datetime): Inclusive end of the queried range
+        expected_messages (list[str]): Messages of the logs expected in the result
     """
     for log in sample_logs:
         temporal_cache.add_log(log)
 
-    start: datetime = datetime(2023, 1, 1, 10, 0)
-    end: datetime = datetime(2023, 1, 1, 11, 0)
-    logs: list[LogEntry] = temporal_cache.get_logs(start, end)
-
-    assert len(logs) == LOGS_IN_RANGE
-    assert logs[0].message == "log1"
-    assert logs[1].message == "log2"
-    assert logs[2].message == "log3"
+    assert [log.message for log in temporal_cache.get_logs(start, end)] == expected_messages
 
 
-def test_get_all_logs(temporal_cache: TemporalCache, sample_logs: list[LogEntry]) -> None:
+def test_get_all_logs(temporal_cache: TemporalCache, sample_logs: tuple[LogEntry, ...]) -> None:
     """Test retrieving all logs from the cache.
 
     Args:
         temporal_cache (TemporalCache): The temporal cache instance under test
-        sample_logs (list[LogEntry]): Predefined sample logs for testing
+        sample_logs (tuple[LogEntry, ...]): Predefined sample logs for testing
 
     Verifies that all logs are returned in the correct order and no logs
     are missing from the result.
@@ -116,12 +157,14 @@ def test_get_all_logs(temporal_cache: TemporalCache, sample_logs: list[LogEntry]
     assert [log.message for log in logs] == ["log1", "log2", "log3", "log4"]
 
 
-def test_prune_cache_delegates_to_pruner(temporal_cache: TemporalCache, mock_pruner: Mock) -> None:
+def test_prune_cache_delegates_to_pruner(
+    temporal_cache: TemporalCache, mock_pruner: _StubPruner
+) -> None:
     """Test that cache pruning is properly delegated to the pruner.
 
     Args:
         temporal_cache (TemporalCache): The temporal cache instance under test
-        mock_pruner (Mock): Mock pruner to verify delegation behavior
+        mock_pruner (_StubPruner): Mock pruner to verify delegation behavior
 
     Verifies that:
         1. The pruner's prune method is called with the correct cache
@@ -138,6 +181,21 @@ def test_prune_cache_delegates_to_pruner(temporal_cache: TemporalCache, mock_pru
     assert result == pruned_logs
 
 
+def test_prune_due_delegates_to_pruner(
+    temporal_cache: TemporalCache, mock_pruner: _StubPruner
+) -> None:
+    """Test that the prune due-check is delegated to the pruner.
+
+    Args:
+        temporal_cache (TemporalCache): The temporal cache instance under test
+        mock_pruner (_StubPruner): Mock pruner to verify delegation behavior
+    """
+    mock_pruner.is_due.return_value = False
+
+    assert temporal_cache.prune_due() is False
+    mock_pruner.is_due.assert_called_once_with(temporal_cache._TemporalCache__cache)  # type: ignore[attr-defined]
+
+
 def test_add_multiple_logs_different_timestamps(temporal_cache: TemporalCache) -> None:
     """Test adding multiple logs with different timestamps.
 
@@ -160,66 +218,208 @@ def test_add_multiple_logs_different_timestamps(temporal_cache: TemporalCache) -
     assert [log.message for log in result] == ["early", "late"]
 
 
-def test_get_logs_partial_overlap_range(
-    temporal_cache: TemporalCache, sample_logs: list[LogEntry]
-) -> None:
-    """Test getting logs with a range that partially overlaps timestamps.
+def test_get_logs_timestamp_order_preserved(temporal_cache: TemporalCache) -> None:
+    """Test that log order is preserved within same timestamp.
+
+    Verifies that logs added with the same timestamp maintain their
+    insertion order when retrieved.
+
+    Args:
+        temporal_cache: Fixture providing initialized TemporalCache instance
+    """
+    timestamp: datetime = datetime(2023, 1, 1, 10, 0)
+    messages: list[str] = ["first", "second", "third"]
+
+    for msg in messages:
+        temporal_cache.add_log(LogEntry(timestamp=timestamp, message=msg, tag="INFO"))
+
+    logs: list[LogEntry] = temporal_cache.get_logs(timestamp, timestamp)
+    assert [log.message for log in logs] == messages
+
+
+def test_add_log_out_of_order_keeps_timestamp_order(temporal_cache: TemporalCache) -> None:
+    """Test that logs arriving out of order are stored in timestamp order.
+
+    Args:
+        temporal_cache: Fixture providing initialized TemporalCache instance
+    """
+    for hour, msg in [(11, "late"), (9, "early"), (10, "middle")]:
+        temporal_cache.add_log(
+            LogEntry(timestamp=datetime(2023, 1, 1, hour, 0), message=msg, tag="INFO")
+        )
+
+    assert [log.message for log in temporal_cache.get_all_logs()] == ["early", "middle", "late"]
+    logs = temporal_cache.get_logs(datetime(2023, 1, 1, 9, 30), datetime(2023, 1, 1, 11, 0))
+    assert [log.message for log in logs] == ["middle", "late"]
+
 
-    Tests retrieval of logs when the time range partially overlaps with stored
-    timestamps, ensuring only logs within range are returned.
+def test_out_of_order_equal_timestamp_keeps_arrival_order(temporal_cache: TemporalCache) -> None:
+    """Test that a late log sharing a timestamp is placed after the earlier arrivals.
 
     Args:
         temporal_cache: Fixture providing initialized TemporalCache instance
+    """
+    for hour, msg in [(10, "first"), (11, "later"), (10, "second")]:
+        temporal_cache.add_log(
+            LogEntry(timestamp=datetime(2023, 1, 1, hour, 0), message=msg, tag="INFO")
+        )
+
+    logs = temporal_cache.get_logs(datetime(2023, 1, 1, 10, 0), datetime(2023, 1, 1, 10, 0))
+    assert [log.message for log in logs] == ["first", "second"]
+    assert [log.message for log in temporal_cache.get_all_logs()] == ["first", "second", "later"]
+
+
+def test_get_logs_after_pruning(sample_logs: tuple[LogEntry, ...]) -> None:
+    """Test that range queries stay correct after pruning deletes the oldest logs.
+
+    Uses a real LogPruner so deletions go through the same sorted container
+    that answers the range queries.
+
+    Args:
         sample_logs: Fixture providing sample log entries
     """
+    temporal_cache = TemporalCache(LogPruner(window_minutes=60))
     for log in sample_logs:
         temporal_cache.add_log(log)
 
-    start: datetime = datetime(2023, 1, 1, 9, 59)  # Just before first log
-    end: datetime = datetime(2023, 1, 1, 10, 30)  # Between first and second group
+    pruned = temporal_cache.prune_cache()
 
-    logs = temporal_cache.get_logs(start, end)
-    assert len(logs) == LOGS_WITH_SAME_TIMESTAMP
-    assert [log.message for log in logs] == ["log1", "log2"]
+    assert [log.message for log in pruned] == ["log1", "log2", "log3"]
+    assert temporal_cache.get_logs(datetime(2023, 1, 1, 10, 0), datetime(2023, 1, 1, 11, 0)) == []
+    logs = temporal_cache.get_logs(datetime(2023, 1, 1, 10, 0), datetime(2023, 1, 1, 12, 0))
+    assert [log.message for log in logs] == ["log4"]
 
 
-def test_get_logs_exact_timestamp_boundaries(temporal_cache: TemporalCache) -> None:
-    """Test getting logs with exact timestamp boundaries.
-
-    Verifies that logs are correctly retrieved when the search range exactly
-    matches log timestamps at the boundaries.
+def test_get_logs_by_tag(temporal_cache: TemporalCache, sample_logs: tuple[LogEntry, ...]) -> None:
+    """Test that a tag-filtered range query only returns logs with that tag.
 
     Args:
-        temporal_cache: Fixture providing initialized TemporalCache instance
+        temporal_cache: Fixture providing a TemporalCache instance
+        sample_logs: Fixture providing sample log entries
     """
-    timestamps: list[datetime] = [
-        datetime(2023, 1, 1, 10, 0),
-        datetime(2023, 1, 1, 11, 0),
-        datetime(2023, 1, 1, 12, 0),
+    for log in sample_logs:
+        temporal_cache.add_log(log)
+
+    start, end = datetime(2023, 1, 1, 10, 0), datetime(2023, 1, 1, 12, 0)
+
+    assert [log.message for log in temporal_cache.get_logs(start, end, "INFO")] == [
+        "log1",
+        "log2",
+        "log4",
     ]
+    assert [log.message for log in temporal_cache.get_logs(start, end, "ERROR")] == ["log3"]
+    assert temporal_cache.get_logs(start, end, "DEBUG") == []
 
-    for i, ts in enumerate(timestamps):
-        temporal_cache.add_log(LogEntry(timestamp=ts, message=f"log{i}", tag="INFO"))
 
-    logs: list[LogEntry] = temporal_cache.get_logs(timestamps[0], timestamps[1])
-    assert len(logs) == BOUNDARY_LOGS_COUNT
-    assert [log.message for log in logs] == ["log0", "log1"]
+def test_get_logs_by_tag_after_pruning(sample_logs: tuple[LogEntry, ...]) -> None:
+    """Test that pruning also removes the deleted logs from the per-tag index.
+
+    Args:
+        sample_logs: Fixture providing sample log entries
+    """
+    temporal_cache = TemporalCache(LogPruner(window_minutes=60))
+    for log in sample_logs:
+        temporal_cache.add_log(log)
 
+    temporal_cache.prune_cache()
 
-def test_get_logs_timestamp_order_preserved(temporal_cache: TemporalCache) -> None:
-    """Test that log order is preserved within same timestamp.
+    start, end = datetime(2023, 1, 1, 10, 0), datetime(2023, 1, 1, 12, 0)
+    assert [log.message for log in temporal_cache.get_logs(start, end, "INFO")] == ["log4"]
+    assert temporal_cache.get_logs(start, end, "ERROR") == []
 
-    Verifies that logs added with the same timestamp maintain their
-    insertion order when retrieved.
+
+def test_get_logs_reuses_result_until_cache_changes(
+    temporal_cache: TemporalCache, sample_logs: tuple[LogEntry, ...]
+) -> None:
+    """Test that repeated range queries are memoized and invalidated by new logs.
 
     Args:
-        temporal_cache: Fixture providing initialized TemporalCache instance
+        temporal_cache: Fixture providing a TemporalCache instance
+        sample_logs: Fixture providing sample log entries
     """
-    timestamp: datetime = datetime(2023, 1, 1, 10, 0)
-    messages: list[str] = ["first", "second", "third"]
+    start, end = datetime(2023, 1, 1, 10, 0), datetime(2023, 1, 1, 12, 0)
+    temporal_cache.add_log(sample_logs[0])
 
-    for msg in messages:
-        temporal_cache.add_log(LogEntry(timestamp=timestamp, message=msg, tag="INFO"))
+    first = temporal_cache.get_logs(start, end)
+    assert temporal_cache.get_logs(start, end) is first
 
-    logs: list[LogEntry] = temporal_cache.get_logs(timestamp, timestamp)
-    assert [log.message for log in logs] == messages
+    temporal_cache.add_log(sample_logs[1])
+    assert [log.message for log in temporal_cache.get_logs(start, end)] == ["log1", "log2"]
+
+
+def test_get_logs_query_cache_is_bounded(temporal_cache: TemporalCache) -> None:
+    """Test that the memoized queries are evicted in LRU order.
+
+    Fills the memo, hits its oldest entry and then adds one more query: the entry
+    evicted must be the least recently used one, not the oldest inserted.
+
+    Args:
+        temporal_cache: Fixture providing a TemporalCache instance
+    """
+    start, end = datetime(2023, 1, 1, 10, 0), datetime(2023, 1, 1, 11, 0)
+
+    def key(tag: str) -> tuple[int, int, str]:
+        return (LogEntry.to_epoch_micros(start), LogEntry.to_epoch_micros(end), tag)
+
+    for i in range(TemporalCache.QUERY_CACHE_SIZE):
+        temporal_cache.get_logs(start, end, str(i))
+    temporal_cache.get_logs(start, end, "0")  # hit: "0" becomes the most recently used
+    temporal_cache.get_logs(start, end, "new")
+
+    query_cache = temporal_cache._TemporalCache__query_cache  # type: ignore[attr-defined]
+    assert len(query_cache) == TemporalCache.QUERY_CACHE_SIZE
+    assert key("0") in query_cache
+    assert key("1") not in query_cache
+    assert key("new") in query_cache
+
+
+def test_bulk_add_logs_matches_add_log(
+    temporal_cache: TemporalCache, mock_pruner: _StubPruner, sample_logs: tuple[LogEntry, ...]
+) -> None:
+    """Test that a bulk insert leaves the cache as one add_log per entry would.
+
+    The batch is fed out of order on top of existing logs to exercise the merge.
+
+    Args:
+        temporal_cache: Fixture providing a TemporalCache instance
+        mock_pruner: Fixture providing a mock LogPruner
+        sample_logs: Fixture providing sample log entries
+    """
+    expected = TemporalCache(mock_pruner)  # type: ignore[arg-type]
+    for log in sample_logs:
+        expected.add_log(log)
+
+    assert temporal_cache.add_log(sample_logs[0]).bulk_add_logs(reversed(sample_logs[1:])) is (
+        temporal_cache
+    )
+
+    start, end = datetime(2023, 1, 1, 10, 0), datetime(2023, 1, 1, 12, 0)
+    assert temporal_cache.get_all_logs() == expected.get_all_logs()
+    assert temporal_cache.get_logs(start, end, "INFO") == expected.get_logs(start, end, "INFO")
+    assert temporal_cache.get_logs(start, end, "ERROR") == expected.get_logs(start, end, "ERROR")
+
+
+def test_bulk_add_logs_empty(temporal_cache: TemporalCache) -> None:
+    """Test that an empty batch leaves the cache untouched.
+
+    Args:
+        temporal_cache: Fixture providing a TemporalCache instance
+    """
+    assert temporal_cache.bulk_add_logs([]).get_all_logs() == []
+
+
+def test_get_logs_mixes_naive_and_aware_timestamps(temporal_cache: TemporalCache) -> None:
+    """Test that naive (UTC) and aware timestamps are ordered and queried on one timeline.
+
+    Args:
+        temporal_cache: Fixture providing a TemporalCache instance
+    """
+    temporal_cache.add_log(
+        LogEntry(timestamp=datetime(2023, 1, 1, 10, 30, tzinfo=UTC), message="aware", tag="INFO")
+    ).add_log(LogEntry(timestamp=datetime(2023, 1, 1, 10, 0), message="naive", tag="INFO"))
+
+    logs = temporal_cache.get_logs(
+        datetime(2023, 1, 1, 10, 0, tzinfo=UTC), datetime(2023, 1, 1, 11, 0)
+    )
+
+    assert [log.message for log in logs] == ["naive", "aware"]